@@ -2,6 +2,7 @@ from bulletarm_baselines.equi_rl.agents.base_agent import BaseAgent
 import numpy as np
 import torch
 from copy import deepcopy
+from bulletarm_baselines.equi_rl.utils.torch_utils import softUpdate
 
 class A2CBase(BaseAgent):
     """
@@ -19,16 +20,23 @@ class A2CBase(BaseAgent):
         self.critic_target = None
         self.critic_optimizer = None
 
-        # action ranges
-        self.p_range = torch.tensor([0, 1])
-        self.dtheta_range = torch.tensor([-dr, dr])
-        self.dx_range = torch.tensor([-dx, dx])
-        self.dy_range = torch.tensor([-dy, dy])
-        self.dz_range = torch.tensor([-dz, dz])
+        # action ranges (min, max), used to build the per dimension action_scale/offset/low/high tensors below
+        self.p_range = (0., 1.)
+        self.dtheta_range = (-float(dr), float(dr))
+        self.dx_range = (-float(dx), float(dx))
+        self.dy_range = (-float(dy), float(dy))
+        self.dz_range = (-float(dz), float(dz))
 
         # dimension of action
         self.n_a = n_a
 
+        # affine map from (-1, 1) into the true scale for each action dimension (p, dx, dy, dz, dtheta)
+        action_ranges = [self.p_range, self.dx_range, self.dy_range, self.dz_range, self.dtheta_range][:n_a]
+        self.action_scale = torch.tensor([(r[1] - r[0]) / 2 for r in action_ranges])
+        self.action_offset = torch.tensor([(r[1] + r[0]) / 2 for r in action_ranges])
+        self.action_low = torch.tensor([r[0] for r in action_ranges])
+        self.action_high = torch.tensor([r[1] for r in action_ranges])
+
     def targetHardUpdate(self):
         """
         Hard update the target networks
@@ -38,17 +46,8 @@ class A2CBase(BaseAgent):
 
     def targetSoftUpdate(self):
         """Soft-update: target = tau*local + (1-tau)*target."""
-        tau = self.tau
-
-        for t_param, l_param in zip(
-                self.actor_target.parameters(), self.actor.parameters()
-        ):
-            t_param.data.copy_(tau * l_param.data + (1.0 - tau) * t_param.data)
-
-        for t_param, l_param in zip(
-                self.critic_target.parameters(), self.critic.parameters()
-        ):
-            t_param.data.copy_(tau * l_param.data + (1.0 - tau) * t_param.data)
+        softUpdate(self.actor_target, self.actor, self.tau)
+        softUpdate(self.critic_target, self.critic, self.tau)
 
 
     def initNetwork(self, actor, critic, initialize_target=True):
@@ -72,6 +71,20 @@ class A2CBase(BaseAgent):
         self.optimizers.append(self.actor_optimizer)
         self.optimizers.append(self.critic_optimizer)
 
+    def compileNetworks(self, mode='reduce-overhead'):
+        """
+        Compile the forward pass of the actor, critic and their target networks with torch.compile. Only forward is
+        replaced so the state dicts (and saved models) are unchanged. Must be called after initNetwork so that the
+        target networks get their own compiled forward instead of sharing the one of the online networks. The default
+        reduce-overhead mode captures cuda graphs that hold the parameters as static inputs, so getSaveState and
+        loadFromState (which move the networks to cpu and back) must only be used before the first compiled call or
+        after the last one, as done in scripts/main.py
+        :param mode: the torch.compile mode
+        """
+        for net in [self.actor, self.critic, self.actor_target, self.critic_target]:
+            if net is not None:
+                net.forward = torch.compile(net.forward, mode=mode, dynamic=False)
+
     def forwardActor(self, state, obs, target_net=False, to_cpu=False):
         """
         Forward pass the actor network
@@ -107,28 +120,13 @@ class A2CBase(BaseAgent):
             output = output.cpu()
         return output
 
-    def decodeActions(self, *args):
+    def decodeActions(self, unscaled_actions):
         """
         Scale the action in range of (-1, 1) into the true scale
-        :param args: unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz, unscaled_dtheta
+        :param unscaled_actions: unscaled actions of shape (batch_size, n_a) ordered as p, dx, dy, dz(, dtheta)
         :return: unscaled_actions (in range (-1, 1)), actions (in true scale)
         """
-        unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz = args[0], args[1], args[2], args[3]
-
-        p = 0.5 * (unscaled_p + 1) * (self.p_range[1] - self.p_range[0]) + self.p_range[0]
-        dx = 0.5 * (unscaled_dx + 1) * (self.dx_range[1] - self.dx_range[0]) + self.dx_range[0]
-        dy = 0.5 * (unscaled_dy + 1) * (self.dy_range[1] - self.dy_range[0]) + self.dy_range[0]
-        dz = 0.5 * (unscaled_dz + 1) * (self.dz_range[1] - self.dz_range[0]) + self.dz_range[0]
-
-        if self.n_a == 5:
-            unscaled_dtheta = args[4]
-            dtheta = 0.5 * (unscaled_dtheta + 1) * (self.dtheta_range[1] - self.dtheta_range[0]) + self.dtheta_range[0]
-            actions = torch.stack([p, dx, dy, dz, dtheta], dim=1)
-            unscaled_actions = torch.stack([unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz, unscaled_dtheta], dim=1)
-        else:
-            actions = torch.stack([p, dx, dy, dz], dim=1)
-            unscaled_actions = torch.stack([unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz], dim=1)
-
+        actions = unscaled_actions * self.action_scale + self.action_offset
         return unscaled_actions, actions
 
     def getActionFromPlan(self, plan):
@@ -137,25 +135,9 @@ class A2CBase(BaseAgent):
         :param plan: scaled planner action (in true scale)
         :return: unscaled_actions (in range (-1, 1)), actions (in true scale)
         """
-        def getUnscaledAction(action, action_range):
-            unscaled_action = 2 * (action - action_range[0]) / (action_range[1] - action_range[0]) - 1
-            return unscaled_action
-        dx = plan[:, 1].clamp(*self.dx_range)
-        p = plan[:, 0].clamp(*self.p_range)
-        dy = plan[:, 2].clamp(*self.dy_range)
-        dz = plan[:, 3].clamp(*self.dz_range)
-
-        unscaled_p = getUnscaledAction(p, self.p_range)
-        unscaled_dx = getUnscaledAction(dx, self.dx_range)
-        unscaled_dy = getUnscaledAction(dy, self.dy_range)
-        unscaled_dz = getUnscaledAction(dz, self.dz_range)
-
-        if self.n_a == 5:
-            dtheta = plan[:, 4].clamp(*self.dtheta_range)
-            unscaled_dtheta = getUnscaledAction(dtheta, self.dtheta_range)
-            return self.decodeActions(unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz, unscaled_dtheta)
-        else:
-            return self.decodeActions(unscaled_p, unscaled_dx, unscaled_dy, unscaled_dz)
+        plan = torch.max(torch.min(plan[:, :self.n_a], self.action_high), self.action_low)
+        unscaled_actions = (plan - self.action_offset) / self.action_scale
+        return self.decodeActions(unscaled_actions)
 
     def getEGreedyActions(self, state, obs, eps):
         """
@@ -172,7 +154,7 @@ class A2CBase(BaseAgent):
         rand_mask = rand < eps
         rand_act = 2*torch.rand(rand_mask.sum(), self.n_a)-1
         unscaled_actions[rand_mask] = rand_act
-        return self.decodeActions(*[unscaled_actions[:, i] for i in range(self.n_a)])
+        return self.decodeActions(unscaled_actions)
 
     def updateTarget(self):
         """
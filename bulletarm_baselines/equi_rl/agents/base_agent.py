@@ -54,6 +54,18 @@ class BaseAgent:
         """
         return self.getEGreedyActions(state, obs, 0)
 
+    def _toDevice(self, array):
+        """
+        Load a numpy array onto self.device. On cuda the array is staged in pinned memory so that the host to device
+        copy is issued asynchronously
+        :param array: numpy array
+        :return: tensor on self.device
+        """
+        tensor = torch.from_numpy(array)
+        if torch.device(self.device).type == 'cuda':
+            tensor = tensor.pin_memory()
+        return tensor.to(self.device, non_blocking=True)
+
     def _loadBatchToDevice(self, batch):
         """
         Load batch into pytorch tensor
@@ -84,20 +96,20 @@ class BaseAgent:
             dones.append(d.done)
             step_lefts.append(d.step_left)
             is_experts.append(d.expert)
-        states_tensor = torch.tensor(np.stack(states)).long().to(self.device)
-        obs_tensor = torch.tensor(np.stack(images)).to(self.device)
+        states_tensor = self._toDevice(np.stack(states)).long()
+        obs_tensor = self._toDevice(np.stack(images))
         if len(obs_tensor.shape) == 3:
             obs_tensor = obs_tensor.unsqueeze(1)
-        action_tensor = torch.tensor(np.stack(xys)).to(self.device)
-        rewards_tensor = torch.tensor(np.stack(rewards)).to(self.device)
-        next_states_tensor = torch.tensor(np.stack(next_states)).long().to(self.device)
-        next_obs_tensor = torch.tensor(np.stack(next_obs)).to(self.device)
+        action_tensor = self._toDevice(np.stack(xys))
+        rewards_tensor = self._toDevice(np.stack(rewards))
+        next_states_tensor = self._toDevice(np.stack(next_states)).long()
+        next_obs_tensor = self._toDevice(np.stack(next_obs))
         if len(next_obs_tensor.shape) == 3:
             next_obs_tensor = next_obs_tensor.unsqueeze(1)
-        dones_tensor = torch.tensor(np.stack(dones)).int()
-        non_final_masks = (dones_tensor ^ 1).float().to(self.device)
-        step_lefts_tensor = torch.tensor(np.stack(step_lefts)).to(self.device)
-        is_experts_tensor = torch.tensor(np.stack(is_experts)).bool().to(self.device)
+        dones_tensor = self._toDevice(np.stack(dones)).int()
+        non_final_masks = (dones_tensor ^ 1).float()
+        step_lefts_tensor = self._toDevice(np.stack(step_lefts))
+        is_experts_tensor = self._toDevice(np.stack(is_experts)).bool()
 
         if obs_type is 'pixel':
             # scale observation from int to float
@@ -4,7 +4,7 @@ import torch
 import torch.nn.functional as F
 from copy import deepcopy
 from bulletarm_baselines.equi_rl.networks.curl_sac_net import CURL
-from bulletarm_baselines.equi_rl.utils.torch_utils import randomCrop, centerCrop
+from bulletarm_baselines.equi_rl.utils.torch_utils import randomCrop, softUpdate
 
 class CURLSAC(SAC):
     """
@@ -24,22 +24,12 @@ class CURLSAC(SAC):
 
     def encoderTargetSoftUpdate(self):
         """Soft-update: target = tau*local + (1-tau)*target."""
-        for t_param, l_param in zip(
-                self.critic_target.encoder.parameters(), self.critic.encoder.parameters()
-        ):
-            t_param.data.copy_(self.encoder_tau * l_param.data + (1.0 - self.encoder_tau) * t_param.data)
+        softUpdate(self.critic_target.encoder, self.critic.encoder, self.encoder_tau)
 
     def targetSoftUpdate(self):
         """Soft-update: target = tau*local + (1-tau)*target."""
-        for t_param, l_param in zip(
-                self.critic_target.q1.parameters(), self.critic.q1.parameters()
-        ):
-            t_param.data.copy_(self.tau * l_param.data + (1.0 - self.tau) * t_param.data)
-
-        for t_param, l_param in zip(
-                self.critic_target.q2.parameters(), self.critic.q2.parameters()
-        ):
-            t_param.data.copy_(self.tau * l_param.data + (1.0 - self.tau) * t_param.data)
+        softUpdate(self.critic_target.q1, self.critic.q1, self.tau)
+        softUpdate(self.critic_target.q2, self.critic.q2, self.tau)
 
         self.encoderTargetSoftUpdate()
 
@@ -90,14 +80,16 @@ class CURLSAC(SAC):
         super().loadModel(path_pre)
         self.actor.encoder.copyConvWeightsFrom(self.critic.encoder)
 
-    def updateCURL(self, update_target=False):
+    def updateCURL(self, update_target=False, obs_anchor=None):
         """
         Update CURL
         :param update_target: whether to update target encoder
+        :param obs_anchor: cropped anchor observation. If None, a new random crop of the batch observation is used
         :return: curl loss
         """
         batch_size, states, obs, action, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts = self._loadLossCalcDict()
-        obs_anchor = randomCrop(obs, out=self.crop_size)
+        if obs_anchor is None:
+            obs_anchor = randomCrop(obs, out=self.crop_size)
         obs_pos = randomCrop(obs, out=self.crop_size)
 
         z_a = self.curl.encode(obs_anchor)
@@ -128,17 +120,14 @@ class CURLSAC(SAC):
         :return: unscaled_actions (in range (-1, 1)), actions (in true scale)
         """
         with torch.no_grad():
-            state_tile = state.reshape(state.size(0), 1, 1, 1).repeat(1, 1, obs.shape[2], obs.shape[3])
-            stacked = torch.cat([obs, state_tile], dim=1).to(self.device)
-
-            stacked = centerCrop(stacked, out=self.crop_size)
+            stacked = self._loadActorInputToDevice(state, obs, self.crop_size)
 
             if evaluate is False:
                 action, _, _ = self.actor.sample(stacked)
             else:
                 _, _, action = self.actor.sample(stacked)
             action = action.to('cpu')
-            return self.decodeActions(*[action[:, i] for i in range(self.n_a)])
+            return self.decodeActions(action)
 
     def updateCURLOnly(self, batch):
         """
@@ -170,14 +159,17 @@ class CURLSAC(SAC):
             qf1_next_target, qf2_next_target = self.critic_target(next_obs, next_state_action)
             qf1_next_target = qf1_next_target.reshape(batch_size)
             qf2_next_target = qf2_next_target.reshape(batch_size)
-            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target) - self.alpha * next_state_log_pi
-            next_q_value = rewards + non_final_masks * self.gamma * min_qf_next_target
+            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target).float().sub(next_state_log_pi, alpha=self.alpha)
+            next_q_value = min_qf_next_target.mul_(non_final_masks).mul_(self.gamma).add_(rewards)
         qf1, qf2 = self.critic(obs, action)  # Two Q-functions to mitigate positive bias in the policy improvement step
         qf1 = qf1.reshape(batch_size)
         qf2 = qf2.reshape(batch_size)
         qf1_loss = F.mse_loss(qf1, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         qf2_loss = F.mse_loss(qf2, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         qf_loss = qf1_loss + qf2_loss
+        # read qf1 and qf2 before the next (possibly cuda graph replayed) critic call can overwrite them
+        with torch.no_grad():
+            td_error = (qf2 - next_q_value).abs_().add_((qf1 - next_q_value).abs_()).mul_(0.5)
 
         self.critic_optimizer.zero_grad()
         qf_loss.backward()
@@ -201,8 +193,8 @@ class CURLSAC(SAC):
             alpha_loss.backward()
             self.alpha_optim.step()
 
-            self.alpha = self.log_alpha.exp()
-            alpha_tlogs = self.alpha.clone() # For TensorboardX logs
+            self.alpha = self.log_alpha.detach().exp().item()
+            alpha_tlogs = torch.tensor(self.alpha) # For TensorboardX logs
         else:
             alpha_loss = torch.tensor(0.).to(self.device)
             alpha_tlogs = torch.tensor(self.alpha) # For TensorboardX logs
@@ -211,9 +203,6 @@ class CURLSAC(SAC):
         if self.num_update % self.target_update_interval == 0:
             self.targetSoftUpdate()
 
-        curl_loss = self.updateCURL(update_target=False)
-
-        with torch.no_grad():
-            td_error = 0.5 * (torch.abs(qf2 - next_q_value) + torch.abs(qf1 - next_q_value))
+        curl_loss = self.updateCURL(update_target=False, obs_anchor=obs)
 
         return (qf1_loss.item(), qf2_loss.item(), policy_loss.item(), alpha_loss.item(), curl_loss.item(), alpha_tlogs.item()), td_error
@@ -33,14 +33,17 @@ class CURLSACfD(CURLSAC):
             qf1_next_target, qf2_next_target = self.critic_target(next_obs, next_state_action)
             qf1_next_target = qf1_next_target.reshape(batch_size)
             qf2_next_target = qf2_next_target.reshape(batch_size)
-            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target) - self.alpha * next_state_log_pi
-            next_q_value = rewards + non_final_masks * self.gamma * min_qf_next_target
+            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target).float().sub(next_state_log_pi, alpha=self.alpha)
+            next_q_value = min_qf_next_target.mul_(non_final_masks).mul_(self.gamma).add_(rewards)
         qf1, qf2 = self.critic(obs, action)  # Two Q-functions to mitigate positive bias in the policy improvement step
         qf1 = qf1.reshape(batch_size)
         qf2 = qf2.reshape(batch_size)
         qf1_loss = F.mse_loss(qf1, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         qf2_loss = F.mse_loss(qf2, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         qf_loss = qf1_loss + qf2_loss
+        # read qf1 and qf2 before the next (possibly cuda graph replayed) critic call can overwrite them
+        with torch.no_grad():
+            td_error = (qf2 - next_q_value).abs_().add_((qf1 - next_q_value).abs_()).mul_(0.5)
 
         self.critic_optimizer.zero_grad()
         qf_loss.backward()
@@ -74,8 +77,8 @@ class CURLSACfD(CURLSAC):
             alpha_loss.backward()
             self.alpha_optim.step()
 
-            self.alpha = self.log_alpha.exp()
-            alpha_tlogs = self.alpha.clone() # For TensorboardX logs
+            self.alpha = self.log_alpha.detach().exp().item()
+            alpha_tlogs = torch.tensor(self.alpha) # For TensorboardX logs
         else:
             alpha_loss = torch.tensor(0.).to(self.device)
             alpha_tlogs = torch.tensor(self.alpha) # For TensorboardX logs
@@ -84,9 +87,6 @@ class CURLSACfD(CURLSAC):
         if self.num_update % self.target_update_interval == 0:
             self.targetSoftUpdate()
 
-        curl_loss = self.updateCURL(update_target=False)
-
-        with torch.no_grad():
-            td_error = 0.5 * (torch.abs(qf2 - next_q_value) + torch.abs(qf1 - next_q_value))
+        curl_loss = self.updateCURL(update_target=False, obs_anchor=obs)
 
         return (qf1_loss.item(), qf2_loss.item(), policy_loss.item(), alpha_loss.item(), curl_loss.item(), alpha_tlogs.item()), td_error
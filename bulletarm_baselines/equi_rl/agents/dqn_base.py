@@ -2,6 +2,7 @@ from bulletarm_baselines.equi_rl.agents.base_agent import BaseAgent
 import numpy as np
 import torch
 from copy import deepcopy
+from bulletarm_baselines.equi_rl.utils.torch_utils import softUpdate
 
 class DQNBase(BaseAgent):
     """
@@ -30,12 +31,7 @@ class DQNBase(BaseAgent):
 
     def targetSoftUpdate(self):
         """Soft-update: target = tau*local + (1-tau)*target."""
-        tau = 1e-2
-
-        for t_param, l_param in zip(
-                self.target_net.parameters(), self.policy_net.parameters()
-        ):
-            t_param.data.copy_(tau * l_param.data + (1.0 - tau) * t_param.data)
+        softUpdate(self.target_net, self.policy_net, 1e-2)
 
     def updateTarget(self):
         """
@@ -1,10 +1,12 @@
 from bulletarm_baselines.equi_rl.agents.a2c_base import A2CBase
+import contextlib
+import math
 import numpy as np
 import torch
 import torch.nn.functional as F
 from copy import deepcopy
-from bulletarm_baselines.equi_rl.utils.parameters import heightmap_size, crop_size
-from bulletarm_baselines.equi_rl.utils.torch_utils import centerCrop
+from bulletarm_baselines.equi_rl.utils.parameters import crop_size
+from bulletarm_baselines.equi_rl.utils.torch_utils import centerCrop, softUpdate
 
 class SAC(A2CBase):
     """
@@ -25,11 +27,15 @@ class SAC(A2CBase):
             if self.automatic_entropy_tuning is True:
                 # self.target_entropy = -torch.prod(torch.Tensor(action_space.shape).to(self.device)).item()
                 self.target_entropy = -n_a
-                self.log_alpha = torch.tensor(np.log(self.alpha), requires_grad=True, device=self.device)
+                self.log_alpha = torch.tensor(math.log(self.alpha), requires_grad=True, device=self.device)
                 # self.alpha_optim = torch.optim.Adam([self.log_alpha], lr=1e-4, betas=(0.5, 0.999))
                 self.alpha_optim = torch.optim.Adam([self.log_alpha], lr=1e-3)
 
         self.num_update = 0
+        # pinned host buffer for loading the actor input in getSACAction
+        self.obs_staging = None
+        # train with bfloat16 autocast and channels last inputs, see enableMixedPrecision
+        self.amp = False
 
     def initNetwork(self, actor, critic, initialize_target=True):
         """
@@ -51,6 +57,26 @@ class SAC(A2CBase):
         self.optimizers.append(self.critic_optimizer)
         self.optimizers.append(self.alpha_optim)
 
+    def enableMixedPrecision(self):
+        """
+        Compute the SAC losses under bfloat16 autocast with channels last convolution inputs. bfloat16 keeps the float32
+        exponent range, so no gradient scaling is needed. Must be called after initNetwork
+        """
+        self.amp = True
+        for net in [self.actor, self.critic, self.critic_target]:
+            if net is not None:
+                net.to(memory_format=torch.channels_last)
+
+    def _autocast(self):
+        """
+        Get the autocast context for the loss calculations. torch.autocast is only touched once mixed precision is
+        enabled, since it does not exist in older pytorch versions
+        :return: bfloat16 torch.autocast context if self.amp, otherwise a null context
+        """
+        if not self.amp:
+            return contextlib.nullcontext()
+        return torch.autocast(torch.device(self.device).type, dtype=torch.bfloat16)
+
     def getSaveState(self):
         """
         Get the save state for checkpointing. Include network states, target network states, and optimizer states
@@ -68,19 +94,15 @@ class SAC(A2CBase):
         :param save_state: the loading state dictionary
         """
         super().loadFromState(save_state)
-        self.alpha = save_state['alpha']
-        self.log_alpha = torch.tensor(np.log(self.alpha.item()), requires_grad=True, device=self.device)
+        # older checkpoints saved alpha as a tensor
+        self.alpha = float(save_state['alpha'])
+        self.log_alpha = torch.tensor(math.log(self.alpha), requires_grad=True, device=self.device)
         self.alpha_optim = torch.optim.Adam([self.log_alpha], lr=1e-3)
         self.alpha_optim.load_state_dict(save_state['alpha_optimizer'])
 
     def targetSoftUpdate(self):
         """Soft-update: target = tau*local + (1-tau)*target."""
-        tau = self.tau
-
-        for t_param, l_param in zip(
-                self.critic_target.parameters(), self.critic.parameters()
-        ):
-            t_param.data.copy_(tau * l_param.data + (1.0 - tau) * t_param.data)
+        softUpdate(self.critic_target, self.critic, self.tau)
 
 
     def getEGreedyActions(self, state, obs, eps):
@@ -103,6 +125,28 @@ class SAC(A2CBase):
         """
         return self.getSACAction(state, obs, evaluate=True)
 
+    def _loadActorInputToDevice(self, state, obs, out_size):
+        """
+        Center crop the observation, stack the gripper state as an extra channel and load the result onto self.device.
+        The crop is taken before stacking so only the cropped image is copied. On cuda, the stacking writes directly
+        into a pinned staging buffer so that the host to device copy is non-blocking
+        :param state: gripper holding state
+        :param obs: observation
+        :param out_size: the size of the cropped observation
+        :return: stacked observation on self.device
+        """
+        if obs.shape[2] > out_size:
+            obs = centerCrop(obs, out=out_size)
+        state_tile = state.reshape(state.size(0), 1, 1, 1).repeat(1, 1, obs.shape[2], obs.shape[3])
+        if torch.device(self.device).type == 'cuda':
+            shape = (obs.shape[0], obs.shape[1] + 1, obs.shape[2], obs.shape[3])
+            if self.obs_staging is None or self.obs_staging.shape != shape or self.obs_staging.dtype != obs.dtype:
+                self.obs_staging = torch.empty(shape, dtype=obs.dtype, pin_memory=True)
+            stacked = torch.cat([obs, state_tile], dim=1, out=self.obs_staging)
+        else:
+            stacked = torch.cat([obs, state_tile], dim=1)
+        return stacked.to(self.device, non_blocking=True)
+
     def getSACAction(self, state, obs, evaluate):
         """
         Get SAC action (greedy or sampled from gaussian, based on evaluate flag)
@@ -113,10 +157,7 @@ class SAC(A2CBase):
         """
         with torch.no_grad():
             if self.obs_type is 'pixel':
-                state_tile = state.reshape(state.size(0), 1, 1, 1).repeat(1, 1, obs.shape[2], obs.shape[3])
-                obs = torch.cat([obs, state_tile], dim=1).to(self.device)
-                if heightmap_size > crop_size:
-                    obs = centerCrop(obs, out=crop_size)
+                obs = self._loadActorInputToDevice(state, obs, crop_size)
             else:
                 obs = obs.to(self.device)
 
@@ -125,21 +166,29 @@ class SAC(A2CBase):
             else:
                 _, _, action = self.actor.sample(obs)
             action = action.to('cpu')
-            return self.decodeActions(*[action[:, i] for i in range(self.n_a)])
+            return self.decodeActions(action)
 
-    def _loadLossCalcDict(self):
+    def _loadBatchToDevice(self, batch):
         """
-        get the loaded batch data in self.loss_calc_dict
-        :return: batch_size, states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts
+        Load batch into pytorch tensor. For pixel observations, the gripper state is stacked as the second channel of
+        obs and next_obs here once, so the loss calculations can read the stacked observations from loss_calc_dict
+        :param batch: list of transitions
+        :return: states_tensor, obs_tensor, action_tensor, rewards_tensor, next_states_tensor, next_obs_tensor,
+                 non_final_masks, step_lefts_tensor, is_experts_tensor
         """
-        batch_size, states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts = super()._loadLossCalcDict()
+        states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts = super()._loadBatchToDevice(batch)
 
         if self.obs_type is 'pixel':
             # stack state as the second channel of the obs
             obs = torch.cat([obs, states.reshape(states.size(0), 1, 1, 1).repeat(1, 1, obs.shape[2], obs.shape[3])], dim=1)
             next_obs = torch.cat([next_obs, next_states.reshape(next_states.size(0), 1, 1, 1).repeat(1, 1, next_obs.shape[2], next_obs.shape[3])], dim=1)
+            if self.amp:
+                obs = obs.contiguous(memory_format=torch.channels_last)
+                next_obs = next_obs.contiguous(memory_format=torch.channels_last)
+            self.loss_calc_dict['obs'] = obs
+            self.loss_calc_dict['next_obs'] = next_obs
 
-        return batch_size, states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts
+        return states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts
 
     def calcActorLoss(self):
         """
@@ -171,15 +220,17 @@ class SAC(A2CBase):
             qf1_next_target, qf2_next_target = self.critic_target(next_obs, next_state_action)
             qf1_next_target = qf1_next_target.reshape(batch_size)
             qf2_next_target = qf2_next_target.reshape(batch_size)
-            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target) - self.alpha * next_state_log_pi
-            next_q_value = rewards + non_final_masks * self.gamma * min_qf_next_target
+            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target).float().sub(next_state_log_pi, alpha=self.alpha)
+            # next_q_value = rewards + non_final_masks * gamma * min_qf_next_target, computed in place. The target is
+            # cast to float32 first so it does not stay in bfloat16 under autocast
+            next_q_value = min_qf_next_target.mul_(non_final_masks).mul_(self.gamma).add_(rewards)
         qf1, qf2 = self.critic(obs, action)  # Two Q-functions to mitigate positive bias in the policy improvement step
         qf1 = qf1.reshape(batch_size)
         qf2 = qf2.reshape(batch_size)
         qf1_loss = F.mse_loss(qf1, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         qf2_loss = F.mse_loss(qf2, next_q_value)  # JQ = 𝔼(st,at)~D[0.5(Q1(st,at) - r(st,at) - γ(𝔼st+1~p[V(st+1)]))^2]
         with torch.no_grad():
-            td_error = 0.5 * (torch.abs(qf2 - next_q_value) + torch.abs(qf1 - next_q_value))
+            td_error = (qf2 - next_q_value).abs_().add_((qf1 - next_q_value).abs_()).mul_(0.5)
         return qf1_loss, qf2_loss, td_error
 
     def updateActorAndAlpha(self):
@@ -187,7 +238,8 @@ class SAC(A2CBase):
         Update actor and alpha
         :return: policy_loss, alpha_loss, alpha
         """
-        policy_loss = self.calcActorLoss()
+        with self._autocast():
+            policy_loss = self.calcActorLoss()
         log_pi = self.loss_calc_dict['log_pi']
 
         self.actor_optimizer.zero_grad()
@@ -201,8 +253,9 @@ class SAC(A2CBase):
             alpha_loss.backward()
             self.alpha_optim.step()
 
-            self.alpha = self.log_alpha.exp()
-            alpha_tlogs = self.alpha.clone()  # For TensorboardX logs
+            # keep alpha as a python float so the loss calculations do not launch extra ops on the alpha tensor
+            self.alpha = self.log_alpha.detach().exp().item()
+            alpha_tlogs = torch.tensor(self.alpha)  # For TensorboardX logs
         else:
             alpha_loss = torch.tensor(0.).to(self.device)
             alpha_tlogs = torch.tensor(self.alpha)  # For TensorboardX logs
@@ -214,7 +267,8 @@ class SAC(A2CBase):
         Update critic
         :return: q1 loss, q2 loss, td error
         """
-        qf1_loss, qf2_loss, td_error = self.calcCriticLoss()
+        with self._autocast():
+            qf1_loss, qf2_loss, td_error = self.calcCriticLoss()
         qf_loss = qf1_loss + qf2_loss
 
         self.critic_optimizer.zero_grad()
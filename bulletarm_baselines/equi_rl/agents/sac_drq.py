@@ -46,7 +46,7 @@ class SACDrQ(SAC):
         self.loss_calc_dict['M_obs'] = M_obs_tensor
         self.loss_calc_dict['M_action'] = M_action_tensor
 
-        return super()._loadBatchToDevice(batch)
+        return states, obs, action_idx, rewards, next_states, next_obs, non_final_masks, step_lefts, is_experts
 
     def calcActorLoss(self):
         batch_size, states, obs, action, rewards, next_states, next_obs, non_final_masks, step_lefts, is_expert = self._loadLossCalcDict()
@@ -77,8 +77,8 @@ class SACDrQ(SAC):
             qf1_next_target, qf2_next_target = self.critic_target(K_next_obs, next_state_action)
             qf1_next_target = qf1_next_target.reshape(self.K*batch_size)
             qf2_next_target = qf2_next_target.reshape(self.K*batch_size)
-            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target) - self.alpha * next_state_log_pi
-            next_q_value = rewards.repeat(self.K) + non_final_masks.repeat(self.K) * self.gamma * min_qf_next_target
+            min_qf_next_target = torch.min(qf1_next_target, qf2_next_target).float().sub(next_state_log_pi, alpha=self.alpha)
+            next_q_value = min_qf_next_target.mul_(non_final_masks.repeat(self.K)).mul_(self.gamma).add_(rewards.repeat(self.K))
             next_q_value = next_q_value.reshape(self.K, batch_size).mean(dim=0)
 
         M_obs = self.loss_calc_dict['M_obs']
@@ -91,5 +91,5 @@ class SACDrQ(SAC):
         qf1_loss = F.mse_loss(qf1, next_q_value)
         qf2_loss = F.mse_loss(qf2, next_q_value)
         with torch.no_grad():
-            td_error = (0.5 * (torch.abs(qf2 - next_q_value) + torch.abs(qf1 - next_q_value))).reshape(self.M, batch_size).mean(dim=0)
+            td_error = (qf2 - next_q_value).abs_().add_((qf1 - next_q_value).abs_()).mul_(0.5).reshape(self.M, batch_size).mean(dim=0)
         return qf1_loss, qf2_loss, td_error
@@ -110,8 +110,14 @@ def createAgent(test=False):
         else:
             raise NotImplementedError
         agent.initNetwork(actor, critic, not test)
+        if amp:
+            agent.enableMixedPrecision()
+        if compile_networks:
+            agent.compileNetworks()
 
     elif alg in ['curl_sac', 'curl_sacfd', 'curl_sacfd_mean']:
+        if amp:
+            raise NotImplementedError('--amp is only supported for the sac, sacfd and drq variants, not {}'.format(alg))
         curl_sac_lr = [actor_lr, critic_lr, lr, lr]
         if alg == 'curl_sac':
             agent = CURLSAC(lr=curl_sac_lr, gamma=gamma, device=device, dx=dpos, dy=dpos, dz=dpos, dr=drot, n_a=len(action_sequence),
@@ -141,6 +147,8 @@ def createAgent(test=False):
         else:
             raise NotImplementedError
         agent.initNetwork(actor, critic)
+        if compile_networks:
+            agent.compileNetworks()
     else:
         raise NotImplementedError
     agent.aug = aug
@@ -60,6 +60,8 @@ training_group.add_argument('--buffer_aug_type', type=str, choices=['se2', 'so2'
 training_group.add_argument('--aug_type', type=str, choices=['se2', 'so2', 't', 'dqn_c4', 'so2_vec', 'shift', 'crop'], default='so2')
 training_group.add_argument('--buffer_aug_n', type=int, default=4, help='The number of augmentation to perform in augmentation buffer (aug, per_expert_aug)')
 training_group.add_argument('--expert_aug_n', type=int, default=0, help='The number of augmentation to perform for the expert data')
+training_group.add_argument('--compile', type=strToBool, default=False, help='If true, compile the forward pass of the actor and critic networks with torch.compile. Checkpoints must not be saved or loaded in the middle of training with this flag')
+training_group.add_argument('--amp', type=strToBool, default=False, help='If true, compute the SAC losses under bfloat16 autocast with channels last inputs (sac, sacfd and drq variants only, raises an error for the curl variants)')
 
 eval_group = parser.add_argument_group('eval')
 eval_group.add_argument('--num_eval_processes', type=int, default=5, help='The number of parallel environments for evaluation')
@@ -153,6 +155,8 @@ aug_type = args.aug_type
 buffer_aug_type = args.buffer_aug_type
 buffer_aug_n = args.buffer_aug_n
 expert_aug_n = args.expert_aug_n
+compile_networks = args.compile
+amp = args.amp
 
 # eval
 eval_freq = args.eval_freq
@@ -76,6 +76,20 @@ def centerCrop(imgs, out=64):
     imgs = imgs[:, :, top:top + out, left:left + out]
     return imgs
 
+def softUpdate(target_net, source_net, tau):
+    """
+    Soft-update: target = tau*source + (1-tau)*target. Uses the multi-tensor _foreach ops so that the update is a
+    couple of fused kernels instead of two kernels per parameter
+    :param target_net: net to copy weights into
+    :param source_net: net to copy weights from
+    :param tau: amount to update weights
+    """
+    with torch.no_grad():
+        target_params = list(target_net.parameters())
+        source_params = list(source_net.parameters())
+        torch._foreach_mul_(target_params, 1.0 - tau)
+        torch._foreach_add_(target_params, source_params, alpha=tau)
+
 def bbox(img, threshold=0.011):
     rows = np.any(img>threshold, axis=1)
     cols = np.any(img>threshold, axis=0)
@@ -402,14 +416,21 @@ def augmentTransition(d, aug_type):
     else:
         raise NotImplementedError
 
-def normalizeTransition(d: ExpertTransition):
-    obs = np.clip(d.obs, 0, 0.32)
-    obs = obs/0.4*255
-    obs = obs.astype(np.uint8)
+def normalizeObs(obs):
+    """
+    Clip the heightmap to (0, 0.32) and scale it into uint8. The clipped copy is scaled in place so that only one float
+    temporary is allocated per call
+    :param obs: heightmap observation
+    :return: uint8 observation
+    """
+    obs = np.clip(obs, 0, 0.32)
+    np.divide(obs, 0.4, out=obs)
+    np.multiply(obs, 255, out=obs)
+    return obs.astype(np.uint8)
 
-    next_obs = np.clip(d.next_obs, 0, 0.32)
-    next_obs = next_obs/0.4*255
-    next_obs = next_obs.astype(np.uint8)
+def normalizeTransition(d: ExpertTransition):
+    obs = normalizeObs(d.obs)
+    next_obs = normalizeObs(d.next_obs)
 
     return ExpertTransition(d.state, obs, d.action, d.reward, d.next_state, next_obs, d.done, d.step_left, d.expert)
 
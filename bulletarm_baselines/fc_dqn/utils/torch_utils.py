@@ -146,8 +146,11 @@ def softUpdate(target_net, source_net, tau):
     - source_net: net to copy weights from
     - tau: Amount to update weights
   '''
-  for target_param, source_param in zip(target_net.parameters(), source_net.parameters()):
-    target_param.data.copy_((1 - tau) * target_param.data + tau * source_param.data)
+  with torch.no_grad():
+    target_params = list(target_net.parameters())
+    source_params = list(source_net.parameters())
+    torch._foreach_mul_(target_params, 1 - tau)
+    torch._foreach_add_(target_params, source_params, alpha=tau)
 
 def hardUpdate(target_net, source_net):
   '''
@@ -61,8 +61,8 @@ class RandomShootingAgent(object):
   def selectAction(self, obs, normalize_obs=True):
     state, hand_obs, obs = obs
 
-    obs = torch.Tensor(obs.astype(np.float32)).view(1, 1, self.config.obs_size, self.config.obs_size)
-    hand_obs = torch.Tensor(hand_obs.astype(np.float32)).view(1, 1, self.config.hand_obs_size, self.config.hand_obs_size)
+    obs = torch.from_numpy(np.ascontiguousarray(obs, dtype=np.float32)).view(1, 1, self.config.obs_size, self.config.obs_size)
+    hand_obs = torch.from_numpy(np.ascontiguousarray(hand_obs, dtype=np.float32)).view(1, 1, self.config.hand_obs_size, self.config.hand_obs_size)
     if normalize_obs:
       obs = data_utils.convertDepthToOneHot(self.preprocessDepth(obs),
                                             self.config.num_depth_classes)
@@ -249,5 +249,5 @@ class RandomShootingAgent(object):
             torch_utils.dictToCpu(self.reward_optimizer.state_dict()))
 
   def setOptimizerState(self, state):
-    self.forward_optimizer.load_state_dict(copy.deepcopy(state[0]))
-    self.reward_optimizer.load_state_dict(copy.deepcopy(state[1]))
+    self.forward_optimizer.load_state_dict(state[0])
+    self.reward_optimizer.load_state_dict(state[1])
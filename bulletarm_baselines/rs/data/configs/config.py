@@ -14,6 +14,7 @@ class Config(object):
     self.num_sampler_workers = constants.GPU_CONFIG[self.num_gpus]['num_sampler_workers']
     self.gen_data_on_gpu = False
     self.per_beta_anneal_steps = None
+    self.storage_sync_interval = 16
 
   def getPerBeta(self, step):
     anneal_steps = self.per_beta_anneal_steps if self.per_beta_anneal_steps else self.training_steps
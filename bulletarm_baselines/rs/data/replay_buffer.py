@@ -90,6 +90,9 @@ class ReplayBuffer():
      weight_batch
     ) = [list() for _ in range(9)]
 
+    training_step = ray.get(shared_storage.getInfo.remote('training_step'))
+    beta = self.config.getPerBeta(training_step)
+
     for _ in range(int(self.config.batch_size / len(self.sampler_workers))):
       samples = list()
       for sampler_worker in self.sampler_workers:
@@ -98,8 +101,6 @@ class ReplayBuffer():
 
         idx = [eps_id, eps_step]
 
-        training_step = ray.get(shared_storage.getInfo.remote('training_step'))
-        beta = self.config.getPerBeta(training_step)
         weight = (1 / (self.total_samples * eps_prob * step_prob)) ** beta
 
         samples.append(sampler_worker.makeTarget.remote(eps_history, eps_step, idx, weight))
@@ -1,4 +1,3 @@
-import copy
 import time
 import gc
 
@@ -20,7 +19,7 @@ class Trainer(object):
 
     self.agent = ADNAgent(self.config, self.device, training=True)
 
-    self.agent.setWeights(copy.deepcopy(initial_checkpoint['weights']))
+    self.agent.setWeights(initial_checkpoint['weights'])
     if initial_checkpoint['optimizer_state'] is not None:
       self.agent.setOptimizerState(initial_checkpoint['optimizer_state'])
 
@@ -33,9 +32,13 @@ class Trainer(object):
     while ray.get(shared_storage.getInfo.remote('num_eps')) <= 5:
       time.sleep(0.1)
 
+    # Status flags and logging info are synced with the shared storage every few steps
+    # instead of every step to keep blocking RPCs off the training loop
+    sampled_idxs = ray.get(shared_storage.getInfo.remote('sampled_idxs'))
+    terminate = False
+
     next_batch = replay_buffer.sample.remote(shared_storage)
-    while self.training_step < self.config.training_steps and \
-          not ray.get(shared_storage.getInfo.remote('terminate')):
+    while self.training_step < self.config.training_steps and not terminate:
       idx_batch, class_weight, batch = ray.get(next_batch)
       next_batch = replay_buffer.sample.remote(shared_storage)
 
@@ -54,8 +57,9 @@ class Trainer(object):
       if self.training_step % self.config.checkpoint_interval == 0:
         shared_storage.setInfo.remote(
           {
-            'weights' : copy.deepcopy(self.agent.getWeights()),
-            'optimizer_state' : copy.deepcopy(self.agent.getOptimizerState())
+            'training_step' : self.training_step,
+            'weights' : self.agent.getWeights(),
+            'optimizer_state' : self.agent.getOptimizerState()
           }
         )
         replay_buffer.updateTargetNetwork.remote(shared_storage)
@@ -63,23 +67,25 @@ class Trainer(object):
           shared_storage.saveReplayBuffer.remote(replay_buffer.getBuffer.remote())
           shared_storage.saveCheckpoint.remote()
 
-      sampled_idxs = ray.get(shared_storage.getInfo.remote('sampled_idxs'))
       idx, count = torch.unique(torch.Tensor(idx_batch)[:,1], return_counts=True)
       sampled_idxs[idx.long()] += count
 
-      shared_storage.setInfo.remote(
-        {
-          'training_step' : self.training_step,
-          'lr' : self.agent.getLR(),
-          'q_value_loss' : q_value_loss,
-          'state_value_loss' : state_value_loss,
-          'reward_loss' : reward_loss,
-          'forward_loss' : forward_loss,
-          'class_weights' : class_weight,
-          'sampled_idxs' : sampled_idxs,
-          'training_pred' : pred_obs
-        }
-      )
+      if self.training_step % self.config.storage_sync_interval == 0 or \
+         self.training_step >= self.config.training_steps:
+        shared_storage.setInfo.remote(
+          {
+            'training_step' : self.training_step,
+            'lr' : self.agent.getLR(),
+            'q_value_loss' : q_value_loss,
+            'state_value_loss' : state_value_loss,
+            'reward_loss' : reward_loss,
+            'forward_loss' : forward_loss,
+            'class_weights' : class_weight,
+            'sampled_idxs' : sampled_idxs,
+            'training_pred' : pred_obs
+          }
+        )
+        terminate = ray.get(shared_storage.getInfo.remote('terminate'))
 
       gc.collect()
 